@@ -7,31 +7,22 @@ from flask_jwt_extended import (
     JWTManager, create_access_token, jwt_required,
     get_jwt_identity
 )
+from sqlalchemy import select, func, cast, literal, inspect, text
 from datetime import datetime, timedelta
-import pandas as pd
-import numpy as np
+from functools import lru_cache
+import os
 import io
 import traceback
 import logging
 import json
 
-# ML imports
-from sklearn.cluster import KMeans
-from sklearn.decomposition import PCA, TruncatedSVD
-from sklearn.preprocessing import StandardScaler
-from sklearn.feature_extraction.text import TfidfTransformer
-
-# mlxtend for Apriori (optional)
-try:
-    from mlxtend.frequent_patterns import apriori, association_rules
-    MLXTEND_AVAILABLE = True
-except Exception:
-    MLXTEND_AVAILABLE = False
+# pandas / numpy / sklearn / mlxtend are imported inside the functions that use them, so worker
+# start-up and the auth routes don't pay for the ML stack. See warm_up_analysis_stack().
 
 # ------------------ FLASK CONFIG ------------------ #
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///market_basket.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///market_basket.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['JWT_SECRET_KEY'] = 'jwt-secret-string'
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
@@ -45,6 +36,9 @@ CORS(app, resources={r"/api/*": {"origins": ["http://localhost:3000", "http://12
 
 logging.basicConfig(level=logging.INFO)
 
+# Import the ML stack at start-up instead of on the first analysis request (for analysis workers)
+app.config['WARM_UP_ANALYSIS'] = os.environ.get('MBA_WARM_UP_ANALYSIS', '').lower() in ('1', 'true', 'yes')
+
 # ------------------ MODELS ------------------ #
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -69,6 +63,13 @@ class Transaction(db.Model):
     amount = db.Column(db.Float, nullable=False)
     transaction_id = db.Column(db.String(255), nullable=True)
 
+    __table_args__ = (
+        # basket grouping / per-basket product lookups
+        db.Index('ix_transaction_txid_product', 'transaction_id', 'product_id'),
+        # date-range queries (the incremental watermark uses the primary key)
+        db.Index('ix_transaction_timestamp', 'timestamp'),
+    )
+
 # ------------------ IN-MEMORY STORES ------------------ #
 # These are per-process in-memory caches (for demo). For production use persistent storage.
 user_data_store = {}              # user_id (str) -> pandas.DataFrame
@@ -77,14 +78,119 @@ association_rules_store = {}      # user_id (str) -> list of rules
 transaction_matrix_store = {}     # user_id (str) -> DataFrame (customer x product)
 user_cluster_assignments = {}     # user_id (str) -> dict(customer_name -> cluster_label)
 cluster_labels_store = {}         # user_id (str) -> { cluster_id: label }
+transaction_watermark_store = {}  # user_id (str) -> id of last Transaction row loaded from DB
+similarity_index_store = {}       # user_id (str) -> customer LSH index (built by kmeans-analysis / load-transactions)
+
+TRANSACTION_FETCH_CHUNK = 5000    # rows per bulk fetch when reading the Transaction table
+
+SIMILARITY_TABLES = 16            # LSH hash tables in the customer similarity index
+SIMILARITY_BUCKET_SIZE = 64       # target customers per bucket; signature bits scale with log2(customers)
+SIMILARITY_MIN_BITS = 4
+SIMILARITY_MAX_BITS = 10
+SIMILARITY_REFIT_DRIFT = 0.25     # rebuild once this share of products is new or customers grew by it
+SIMILARITY_NEIGHBOURS = 20        # similar customers blended into /api/recommend
+SIMILARITY_MAX_CANDIDATES = 500   # cap on exact cosine re-ranking per query (bounds latency)
 
 # ------------------ HELPERS ------------------ #
+@lru_cache(maxsize=None)
+def load_mlxtend():
+    """
+    Import mlxtend's (apriori, association_rules) on first use. Returns None if mlxtend is not installed.
+    """
+    try:
+        from mlxtend.frequent_patterns import apriori, association_rules
+        return apriori, association_rules
+    except Exception:
+        return None
+
+def warm_up_analysis_stack():
+    """
+    Import everything the analysis routes need so the first analysis request doesn't pay for it.
+    Runs at import time when MBA_WARM_UP_ANALYSIS is set; can also be called from a worker hook
+    (e.g. gunicorn post_fork) for analysis-only workers.
+    """
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    import sklearn.cluster  # noqa: F401
+    import sklearn.decomposition  # noqa: F401
+    import sklearn.preprocessing  # noqa: F401
+    import sklearn.feature_extraction.text  # noqa: F401
+    load_mlxtend()
+
 def safe_int(val, default):
     try:
         return int(val)
     except Exception:
         return default
 
+def clear_analysis_caches(user_id):
+    """
+    Drop every analysis result derived from the user's current dataset.
+    """
+    kmeans_models_store.pop(str(user_id), None)
+    association_rules_store.pop(str(user_id), None)
+    transaction_matrix_store.pop(str(user_id), None)
+    user_cluster_assignments.pop(str(user_id), None)
+    cluster_labels_store.pop(str(user_id), None)
+
+_transaction_schema_ready = False
+
+def ensure_transaction_schema():
+    """
+    Bring an existing 'transaction' table up to date. db.create_all() never alters tables that
+    already exist, so older databases lack the transaction_id column and the basket/timestamp indexes.
+    Runs the checks once per process.
+    """
+    global _transaction_schema_ready
+    if _transaction_schema_ready:
+        return
+    columns = {c['name'] for c in inspect(db.engine).get_columns('transaction')}
+    if 'transaction_id' not in columns:
+        with db.engine.begin() as conn:
+            conn.execute(text('ALTER TABLE "transaction" ADD COLUMN transaction_id VARCHAR(255)'))
+    for index in Transaction.__table__.indexes:
+        index.create(bind=db.engine, checkfirst=True)
+    _transaction_schema_ready = True
+
+def load_transactions_from_db(since=None, chunk_size=TRANSACTION_FETCH_CHUNK):
+    """
+    Read baskets straight from the Transaction table in chunked bulk fetches.
+    Returns (DataFrame, watermark) where the DataFrame has 'transaction_id', 'product_id' and
+    'user_id' columns (the legacy layout understood by the analysis helpers) and watermark is the
+    id of the last row read. Pass a previous watermark as `since` to fetch only rows inserted after it;
+    ids are autoincrementing, so backdated or late-arriving rows are still picked up.
+    Rows without a transaction_id are treated as single-row baskets keyed 'row:<id>', so they can't
+    collide with real (often numeric) transaction ids.
+    """
+    import numpy as np
+    import pandas as pd
+
+    basket_key = func.coalesce(Transaction.transaction_id, literal('row:', db.String) + cast(Transaction.id, db.String))
+    stmt = select(Transaction.id, basket_key, Transaction.product_id, Transaction.user_id)
+    if since is not None:
+        stmt = stmt.where(Transaction.id > since)
+    stmt = stmt.order_by(Transaction.id)
+
+    baskets, products, customers = [], [], []
+    watermark = since
+    result = db.session.execute(stmt.execution_options(yield_per=chunk_size))
+    for rows in result.partitions(chunk_size):
+        ids, tx_ids, product_ids, user_ids = zip(*rows)
+        baskets.append(np.asarray(tx_ids, dtype=object))
+        products.append(np.asarray(product_ids, dtype=np.int64))
+        customers.append(np.asarray(user_ids, dtype=np.int64))
+        watermark = ids[-1]
+
+    if not baskets:
+        return pd.DataFrame(columns=['transaction_id', 'product_id', 'user_id']), watermark
+
+    df = pd.DataFrame({
+        'transaction_id': np.concatenate(baskets),
+        'product_id': np.concatenate(products),
+        'user_id': np.concatenate(customers)
+    })
+    return df, watermark
+
 def compute_transaction_matrix(df):
     """
     Build customer x product matrix. Supports:
@@ -92,6 +198,8 @@ def compute_transaction_matrix(df):
       - 'user_id' & 'product_id' (legacy)
     Returns pandas DataFrame (rows=customer, cols=product) with counts.
     """
+    import pandas as pd
+
     df_local = df.copy()
 
     if "Customer" in df_local.columns and "Product" in df_local.columns:
@@ -117,6 +225,8 @@ def compute_apriori_rules_from_transactions(df, min_support=0.01, min_confidence
     If mlxtend is not available, a fallback co-occurrence heuristic is used.
     Returns list of rules with numeric support/confidence/lift (lift may be None -> set to 0).
     """
+    import pandas as pd
+
     try:
         if "transaction_id" in df.columns and "product_id" in df.columns:
             transactions = df.groupby("transaction_id")["product_id"].apply(list)
@@ -139,7 +249,9 @@ def compute_apriori_rules_from_transactions(df, min_support=0.01, min_confidence
                 rows.append({it: (1 if it in items else 0) for it in all_items})
             one_hot = pd.DataFrame(rows)
 
-        if MLXTEND_AVAILABLE:
+        mlxtend = load_mlxtend()
+        if mlxtend is not None:
+            apriori, association_rules = mlxtend
             frequent = apriori(one_hot, min_support=min_support, use_colnames=True)
             if frequent.empty:
                 return []
@@ -193,6 +305,212 @@ def compute_apriori_rules_from_transactions(df, min_support=0.01, min_confidence
         app.logger.error(f"Apriori failure: {e}\n{traceback.format_exc()}")
         return []
 
+def fit_customer_features(tm):
+    """
+    Fit customer feature vectors on the customer x product matrix: TF-IDF weighting (reduces heavy-user
+    dominance), then TruncatedSVD for wide matrices.
+    Returns (X, tfidf, svd): a dense array with one row per tm.index entry and the fitted transformers
+    (None where a step was skipped), so later rows can be projected with transform_customer_features().
+    """
+    import numpy as np
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.feature_extraction.text import TfidfTransformer
+
+    try:
+        tfidf = TfidfTransformer().fit(tm.values)
+        X = tfidf.transform(tm.values)
+    except Exception:
+        tfidf = None
+        X = tm.values.astype(float)
+
+    # If sparse, reduce dims or convert
+    try:
+        if hasattr(X, 'shape') and X.shape[1] > 200:
+            svd = TruncatedSVD(n_components=min(50, X.shape[1]-1), random_state=42).fit(X)
+            return svd.transform(X), tfidf, svd
+    except Exception:
+        pass
+    return (X.toarray() if hasattr(X, 'toarray') else np.array(X, dtype=float)), tfidf, None
+
+def transform_customer_features(counts, tfidf, svd):
+    """
+    Project raw customer x product counts with transformers returned by fit_customer_features().
+    """
+    import numpy as np
+    X = tfidf.transform(counts) if tfidf is not None else np.asarray(counts, dtype=float)
+    if svd is not None:
+        return svd.transform(X)
+    return X.toarray() if hasattr(X, 'toarray') else np.array(X, dtype=float)
+
+def similarity_bits(n_customers):
+    """
+    Signature bits per LSH table, scaled so a bucket holds roughly SIMILARITY_BUCKET_SIZE customers.
+    """
+    import math
+    bits = round(math.log2(max(1, n_customers) / SIMILARITY_BUCKET_SIZE))
+    return max(SIMILARITY_MIN_BITS, min(SIMILARITY_MAX_BITS, bits))
+
+def _lsh_keys(planes, X):
+    """
+    Random-hyperplane signatures for the rows of X, packed into one integer bucket key per table.
+    Returns an int64 array of shape (n_rows, n_tables).
+    """
+    import numpy as np
+    bits = np.einsum('tbd,nd->ntb', planes, X) > 0
+    return bits.astype(np.int64) @ (1 << np.arange(planes.shape[1], dtype=np.int64))
+
+def _index_customers(index, customer_ids, counts, X):
+    """
+    (Re-)insert customers into the index with their raw counts and feature vectors.
+    """
+    import numpy as np
+    X = np.asarray(X, dtype=float)
+    vectors = X / np.maximum(np.linalg.norm(X, axis=1, keepdims=True), 1e-12)
+    keys = _lsh_keys(index['planes'], vectors)
+    for cid, row_counts, vector, row_keys in zip(customer_ids, counts, vectors, keys):
+        _unindex_customer(index, cid)
+        index['counts'][cid] = row_counts
+        index['vectors'][cid] = vector
+        index['keys'][cid] = row_keys
+        for t, key in enumerate(row_keys):
+            index['buckets'][t][int(key)].add(cid)
+
+def _unindex_customer(index, customer_id):
+    """
+    Remove a customer and its bucket entries from the index (no-op if absent).
+    """
+    keys = index['keys'].pop(customer_id, None)
+    if keys is None:
+        return
+    index['counts'].pop(customer_id, None)
+    index['vectors'].pop(customer_id, None)
+    for t, key in enumerate(keys):
+        bucket = index['buckets'][t].get(int(key))
+        if bucket is not None:
+            bucket.discard(customer_id)
+            if not bucket:
+                del index['buckets'][t][int(key)]
+
+def build_similarity_index(tm, features=None, n_tables=SIMILARITY_TABLES, seed=42):
+    """
+    Random-projection LSH index over the customers of the transaction matrix `tm`.
+    `features` is the (X, tfidf, svd) result of fit_customer_features(tm) when the caller already has it.
+    The fitted transformers are kept so update_similarity_index() can project new or changed
+    customers without refitting.
+    """
+    import numpy as np
+    from collections import defaultdict
+
+    X, tfidf, svd = features if features is not None else fit_customer_features(tm)
+    rng = np.random.default_rng(seed)
+    index = {
+        'planes': rng.standard_normal((n_tables, similarity_bits(len(tm.index)), X.shape[1])),
+        'tfidf': tfidf,
+        'svd': svd,
+        'products': list(tm.columns),                # vocabulary the transformers were fitted on
+        'fitted_customers': int(len(tm.index)),
+        'counts': {},                                # customer id -> raw counts over 'products'
+        'vectors': {},                               # customer id -> L2-normalised feature vector
+        'keys': {},                                  # customer id -> bucket key per table
+        'buckets': [defaultdict(set) for _ in range(n_tables)]  # per table: key -> customer ids
+    }
+    _index_customers(index, tm.index.astype(str).tolist(), tm.values, X)
+    return index
+
+def update_similarity_index(index, tm):
+    """
+    Apply changes in `tm` without refitting: new customers and customers whose counts changed are
+    projected with the frozen transformers and re-hashed; customers missing from `tm` are dropped.
+    Products the transformers were not fitted on are ignored until the next rebuild.
+    Returns the number of customers (re-)indexed.
+    """
+    import numpy as np
+    ids = tm.index.astype(str).tolist()
+    counts = tm.reindex(columns=index['products'], fill_value=0).values
+
+    present = set(ids)
+    for cid in [c for c in index['keys'] if c not in present]:
+        _unindex_customer(index, cid)
+
+    changed = [i for i, cid in enumerate(ids)
+               if cid not in index['counts'] or not np.array_equal(index['counts'][cid], counts[i])]
+    if changed:
+        X = transform_customer_features(counts[changed], index['tfidf'], index['svd'])
+        _index_customers(index, [ids[i] for i in changed], counts[changed], X)
+    return len(changed)
+
+def _copy_similarity_index(index):
+    """
+    Copy of an index that can be updated without touching the original. Arrays and fitted
+    transformers are shared (updates replace them, never modify them); dicts and bucket sets are copied.
+    """
+    from collections import defaultdict
+    copied = dict(index)
+    for name in ('counts', 'vectors', 'keys'):
+        copied[name] = dict(index[name])
+    copied['buckets'] = [defaultdict(set, {key: set(ids) for key, ids in table.items()})
+                         for table in index['buckets']]
+    return copied
+
+def refresh_similarity_index(user_id, tm):
+    """
+    Keep the user's similarity index in step with `tm`. Changes are applied to a copy that replaces
+    the stored index in a single assignment, so concurrent /api/recommend requests always read a
+    consistent index. The index is rebuilt (transformers refitted, bits rescaled) once the products
+    or customers have drifted more than SIMILARITY_REFIT_DRIFT from what it was fitted on.
+    """
+    index = similarity_index_store.get(str(user_id))
+    if index is not None:
+        unknown_products = len(tm.columns.difference(index['products']))
+        if (unknown_products > SIMILARITY_REFIT_DRIFT * len(tm.columns)
+                or len(tm.index) > (1 + SIMILARITY_REFIT_DRIFT) * index['fitted_customers']):
+            index = None
+    if index is None:
+        index = build_similarity_index(tm)
+    else:
+        index = _copy_similarity_index(index)
+        update_similarity_index(index, tm)
+    similarity_index_store[str(user_id)] = index
+    return index
+
+def query_similar_customers(index, customer_id, top_n=SIMILARITY_NEIGHBOURS, max_candidates=SIMILARITY_MAX_CANDIDATES):
+    """
+    Approximate nearest neighbours of a customer already in the index. Candidates come from the
+    customer's LSH buckets; the max_candidates sharing the most tables with it are re-ranked by exact
+    cosine similarity. Returns [(customer_id, similarity)] best first, excluding the customer itself.
+    """
+    import numpy as np
+    from collections import Counter
+
+    customer_id = str(customer_id)
+    keys = index['keys'].get(customer_id)
+    if keys is None:
+        return []
+    collisions = Counter()
+    for t, key in enumerate(keys):
+        collisions.update(index['buckets'][t].get(int(key), ()))
+    collisions.pop(customer_id, None)
+    candidates = [c for c, _ in collisions.most_common(max_candidates)]
+    if not candidates:
+        return []
+    sims = np.vstack([index['vectors'][c] for c in candidates]) @ index['vectors'][customer_id]
+    order = np.argsort(-sims)[:top_n]
+    return [(candidates[i], float(sims[i])) for i in order if sims[i] > 0]
+
+def recommend_from_neighbours(tm, neighbours, cart_items, top_k=5):
+    """
+    Score products by the similarity-weighted purchase counts of neighbouring customers.
+    """
+    import numpy as np
+    neighbours = [(c, s) for c, s in neighbours if c in tm.index]
+    if not neighbours:
+        return []
+    weights = np.array([s for _, s in neighbours])
+    scores = weights @ tm.loc[[c for c, _ in neighbours]].values
+    cart_set = set([str(x) for x in cart_items])
+    ranked = [str(tm.columns[i]) for i in np.argsort(-scores) if scores[i] > 0]
+    return [p for p in ranked if p not in cart_set][:top_k]
+
 def recommend_from_rules(rules, cart_items, top_k=5):
     """
     Score candidate consequents by confidence * support where antecedent subset matches the cart.
@@ -288,6 +606,8 @@ def upload_data():
     if not file.filename.lower().endswith('.csv'):
         return jsonify({'message': 'Invalid file format - CSV required'}), 400
 
+    import pandas as pd
+
     try:
         payload = file.stream.read().decode("utf-8")
         df = pd.read_csv(io.StringIO(payload))
@@ -296,18 +616,73 @@ def upload_data():
         # store
         user_data_store[str(current_user_id)] = df
 
-        # clear caches
-        kmeans_models_store.pop(str(current_user_id), None)
-        association_rules_store.pop(str(current_user_id), None)
-        transaction_matrix_store.pop(str(current_user_id), None)
-        user_cluster_assignments.pop(str(current_user_id), None)
-        cluster_labels_store.pop(str(current_user_id), None)
+        # clear caches (an uploaded CSV replaces any DB-sourced data, so restart its watermark too;
+        # the similarity index is rebuilt by the next kmeans-analysis)
+        clear_analysis_caches(current_user_id)
+        transaction_watermark_store.pop(str(current_user_id), None)
+        similarity_index_store.pop(str(current_user_id), None)
 
         return jsonify({'message': 'Data uploaded successfully', 'rows': int(len(df)), 'columns': int(len(df.columns))}), 200
     except Exception as e:
         app.logger.error(traceback.format_exc())
         return jsonify({'message': f'Error processing file: {str(e)}'}), 400
 
+# ------------------ LOAD FROM DATABASE ------------------ #
+@app.route('/api/load-transactions', methods=['POST'])
+@jwt_required()
+def load_transactions():
+    """
+    Use the Transaction table as the analysis source instead of an uploaded CSV.
+    With 'incremental' (default) only rows inserted since the previous load are fetched and appended.
+    """
+    current_user_id = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
+    incremental = data.get('incremental', True)
+    if not isinstance(incremental, bool):
+        incremental = str(incremental).lower() in ('1', 'true', 'yes')
+    since = transaction_watermark_store.get(str(current_user_id)) if incremental else None
+
+    import pandas as pd
+
+    try:
+        ensure_transaction_schema()
+        df_new, watermark = load_transactions_from_db(since=since)
+
+        if since is not None and str(current_user_id) in user_data_store:
+            if df_new.empty:
+                df = user_data_store[str(current_user_id)]
+                return jsonify({'message': 'No new transactions', 'rows': int(len(df)), 'new_rows': 0}), 200
+            df = pd.concat([user_data_store[str(current_user_id)], df_new], ignore_index=True)
+        else:
+            df = df_new
+
+        if df.empty:
+            return jsonify({'message': 'No transactions found in database'}), 400
+
+        user_data_store[str(current_user_id)] = df
+        transaction_watermark_store[str(current_user_id)] = watermark
+        clear_analysis_caches(current_user_id)
+
+        # keep "customers like me" current so /api/recommend never builds it inline
+        try:
+            tm = compute_transaction_matrix(df)
+            if not tm.empty:
+                transaction_matrix_store[str(current_user_id)] = tm
+                refresh_similarity_index(current_user_id, tm)
+        except Exception:
+            app.logger.exception("Similarity index refresh failed")
+
+        return jsonify({
+            'message': 'Transactions loaded successfully',
+            'rows': int(len(df)),
+            'new_rows': int(len(df_new)),
+            'watermark': int(watermark)
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(traceback.format_exc())
+        return jsonify({'message': f'Error loading transactions: {str(e)}'}), 500
+
 # ------------------ KMEANS ------------------ #
 @app.route('/api/kmeans-analysis', methods=['POST'])
 @jwt_required()
@@ -320,6 +695,12 @@ def kmeans_analysis():
     data = request.get_json(silent=True) or {}
     n_clusters = safe_int(data.get('n_clusters', 3), 3)
 
+    import numpy as np
+    import pandas as pd
+    from sklearn.cluster import KMeans
+    from sklearn.decomposition import PCA, TruncatedSVD
+    from sklearn.preprocessing import StandardScaler
+
     try:
         tm = compute_transaction_matrix(df)
         if tm.empty:
@@ -331,22 +712,14 @@ def kmeans_analysis():
         # clamp clusters
         n_clusters = max(1, min(n_clusters, tm.shape[0]))
 
-        # TF-IDF transform to reduce heavy-user dominance
-        try:
-            tfidf = TfidfTransformer()
-            X = tfidf.fit_transform(tm.values)
-        except Exception:
-            X = tm.values.astype(float)
+        features = fit_customer_features(tm)
+        X_reduced = features[0]
 
-        # If sparse, reduce dims or convert
+        # full refit of the "customers like me" index from the same features
         try:
-            if hasattr(X, 'shape') and X.shape[1] > 200:
-                svd = TruncatedSVD(n_components=min(50, X.shape[1]-1), random_state=42)
-                X_reduced = svd.fit_transform(X)
-            else:
-                X_reduced = X.toarray() if hasattr(X, 'toarray') else np.array(X, dtype=float)
+            similarity_index_store[str(current_user_id)] = build_similarity_index(tm, features)
         except Exception:
-            X_reduced = X.toarray() if hasattr(X, 'toarray') else np.array(X, dtype=float)
+            app.logger.exception("Similarity index refresh failed")
 
         scaler = StandardScaler(with_mean=False)
         X_scaled = scaler.fit_transform(X_reduced)
@@ -497,6 +870,18 @@ def recommend():
 
     recs_by_rules = recommend_from_rules(rules, cart, top_k)
 
+    # customers like me (LSH neighbours of the target customer); the index is built by
+    # kmeans-analysis / load-transactions, never inline here
+    by_neighbours = []
+    try:
+        tm = transaction_matrix_store.get(str(current_user_id))
+        index = similarity_index_store.get(str(current_user_id))
+        if tm is not None and index is not None:
+            neighbours = query_similar_customers(index, target_user)
+            by_neighbours = recommend_from_neighbours(tm, neighbours, cart, top_k)
+    except Exception:
+        app.logger.exception("Neighbour recommendations failed")
+
     # cluster boost
     cluster_boost = []
     try:
@@ -515,14 +900,19 @@ def recommend():
     # combine
     final = []
     seen = set()
-    for item in recs_by_rules + cluster_boost:
+    for item in recs_by_rules + by_neighbours + cluster_boost:
         if item not in seen:
             final.append(item)
             seen.add(item)
         if len(final) >= top_k:
             break
 
-    return jsonify({'recommendations': final, 'by_rules': recs_by_rules, 'cluster_boost': cluster_boost}), 200
+    return jsonify({
+        'recommendations': final,
+        'by_rules': recs_by_rules,
+        'by_neighbours': by_neighbours,
+        'cluster_boost': cluster_boost
+    }), 200
 
 # ------------------ DASHBOARD STATS ------------------ #
 @app.route('/api/dashboard-stats', methods=['GET'])
@@ -592,6 +982,8 @@ def download_kmeans_output():
       - cluster_stats.json (clusters metadata)
     Packaged as a single CSV (visualization) or JSON depending on 'format' query param.
     """
+    import pandas as pd
+
     current_user_id = get_jwt_identity()
     fmt = (request.args.get('format') or 'csv').lower()
     # try to reconstruct last kmeans results from stores:
@@ -666,6 +1058,8 @@ def download_association_rules():
     """
     Returns association rules as CSV or JSON depending on 'format' query param.
     """
+    import pandas as pd
+
     current_user_id = get_jwt_identity()
     fmt = (request.args.get('format') or 'csv').lower()
     rules = association_rules_store.get(str(current_user_id))
@@ -704,8 +1098,12 @@ def download_association_rules():
         app.logger.error(traceback.format_exc())
         return jsonify({'message': 'Failed to generate association rules download'}), 500
 
+if app.config['WARM_UP_ANALYSIS']:
+    warm_up_analysis_stack()
+
 # ------------------ RUN ------------------ #
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+        ensure_transaction_schema()
     app.run(debug=True, host='127.0.0.1', port=5000)
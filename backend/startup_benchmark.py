@@ -0,0 +1,63 @@
+# startup_benchmark.py
+"""
+Measure backend worker start-up: time to import app.py and the process's peak RSS.
+Each scenario runs in a fresh interpreter so nothing is already imported.
+
+    python startup_benchmark.py [--runs 5]
+
+Scenarios:
+  - lazy:      plain import (what an auth/upload worker pays)
+  - warm:      import with MBA_WARM_UP_ANALYSIS=1 (ML stack loaded at start-up)
+  - analysis:  plain import followed by the first analysis-style import of the ML stack
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CHILD_SCRIPT = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+import app
+if {analysis}:
+    app.warm_up_analysis_stack()
+elapsed = time.perf_counter() - t0
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+# ru_maxrss is KiB on Linux, bytes on macOS
+rss_mb = rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+heavy = sorted(m for m in ('pandas', 'numpy', 'sklearn', 'mlxtend') if m in sys.modules)
+print(json.dumps({{'seconds': elapsed, 'rss_mb': rss_mb, 'loaded': heavy}}))
+"""
+
+SCENARIOS = {
+    'lazy': ({}, False),
+    'warm': ({'MBA_WARM_UP_ANALYSIS': '1'}, False),
+    'analysis': ({}, True),
+}
+
+def run_once(extra_env, analysis):
+    env = dict(os.environ, **extra_env)
+    out = subprocess.run(
+        [sys.executable, '-c', CHILD_SCRIPT.format(analysis=analysis)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per scenario')
+    args = parser.parse_args()
+
+    print(f"{'scenario':<10} {'import (s)':>12} {'peak RSS (MB)':>15}  loaded")
+    for name, (extra_env, analysis) in SCENARIOS.items():
+        results = [run_once(extra_env, analysis) for _ in range(max(1, args.runs))]
+        seconds = sorted(r['seconds'] for r in results)[len(results) // 2]
+        rss_mb = sorted(r['rss_mb'] for r in results)[len(results) // 2]
+        loaded = ', '.join(results[-1]['loaded']) or '-'
+        print(f"{name:<10} {seconds:>12.3f} {rss_mb:>15.1f}  {loaded}")
+
+if __name__ == '__main__':
+    main()
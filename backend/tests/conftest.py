@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+os.environ['DATABASE_URL'] = 'sqlite://'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as backend  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    with backend.app.app_context():
+        backend.db.drop_all()
+        backend.db.create_all()
+        backend.ensure_transaction_schema()
+        for store in (backend.user_data_store, backend.transaction_watermark_store,
+                      backend.transaction_matrix_store, backend.similarity_index_store):
+            store.clear()
+        yield backend.app.test_client()
+        backend.db.session.remove()
+
+
+@pytest.fixture
+def auth(client):
+    r = client.post('/api/register', json={'username': 'analyst', 'email': 'a@example.com', 'password': 'pw'})
+    return {'Authorization': f"Bearer {r.get_json()['token']}"}
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+import pytest
+
+import app as backend
+
+
+def add_rows(*rows):
+    for tx_id, product_id, timestamp in rows:
+        backend.db.session.add(backend.Transaction(
+            user_id=1, product_id=product_id, quantity=1, amount=1.0,
+            transaction_id=tx_id, timestamp=timestamp
+        ))
+    backend.db.session.commit()
+
+
+def test_incremental_load_picks_up_backdated_rows(client, auth):
+    add_rows(('t1', 1, datetime(2024, 1, 5)), ('t1', 2, datetime(2024, 1, 5)))
+    r = client.post('/api/load-transactions', json={}, headers=auth)
+    assert r.status_code == 200
+    assert r.get_json()['new_rows'] == 2
+
+    # late-arriving batch stamped before the rows already loaded
+    add_rows(('t2', 1, datetime(2024, 1, 2)), ('t3', 3, datetime(2023, 12, 31)))
+    r = client.post('/api/load-transactions', json={}, headers=auth)
+    body = r.get_json()
+    assert body['new_rows'] == 2
+    assert body['rows'] == 4
+
+    r = client.post('/api/load-transactions', json={}, headers=auth)
+    assert r.get_json()['new_rows'] == 0
+
+
+@pytest.mark.parametrize('flag', [False, 'false', '0', 'no'])
+def test_non_incremental_flag_reloads_everything(client, auth, flag):
+    add_rows(('t1', 1, datetime(2024, 1, 5)), ('t2', 2, datetime(2024, 1, 6)))
+    client.post('/api/load-transactions', json={}, headers=auth)
+
+    r = client.post('/api/load-transactions', json={'incremental': flag}, headers=auth)
+    body = r.get_json()
+    assert body['new_rows'] == 2
+    assert body['rows'] == 2
+
+
+def test_rows_without_transaction_id_do_not_merge_with_numeric_ids(client, auth):
+    backend.db.session.add(backend.Transaction(user_id=1, product_id=10, quantity=1, amount=1.0))
+    backend.db.session.add(backend.Transaction(user_id=2, product_id=20, quantity=1, amount=1.0, transaction_id='1'))
+    backend.db.session.commit()
+
+    client.post('/api/load-transactions', json={}, headers=auth)
+    df = backend.user_data_store['1']
+    baskets = df.groupby('transaction_id')['product_id'].apply(sorted).to_dict()
+    assert baskets == {'row:1': [10], '1': [20]}
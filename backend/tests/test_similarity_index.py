@@ -0,0 +1,113 @@
+import io
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import app as backend
+
+
+def segmented_matrix(n_customers, n_products=150, n_segments=5, seed=0):
+    """Customer x product counts where each customer shops from one of a few preference segments."""
+    rng = np.random.default_rng(seed)
+    segments = rng.integers(0, n_segments, n_customers)
+    prefs = rng.dirichlet(np.full(n_products, 0.1), n_segments)
+    counts = np.array([rng.multinomial(rng.integers(5, 30), prefs[s]) for s in segments])
+    return pd.DataFrame(
+        counts,
+        index=[f'c{i}' for i in range(n_customers)],
+        columns=[f'p{j}' for j in range(n_products)]
+    )
+
+
+def test_recall_against_brute_force_cosine():
+    tm = segmented_matrix(1000)
+    index = backend.build_similarity_index(tm)
+
+    vectors = np.vstack([index['vectors'][c] for c in tm.index])
+    sims = vectors @ vectors.T
+    np.fill_diagonal(sims, -np.inf)
+
+    top_n = backend.SIMILARITY_NEIGHBOURS
+    recalls = []
+    for row, customer in enumerate(tm.index[:200]):
+        found = {c for c, _ in backend.query_similar_customers(index, customer, top_n=top_n)}
+        exact = {tm.index[j] for j in np.argsort(-sims[row])[:top_n]}
+        assert found
+        recalls.append(len(found & exact) / top_n)
+    assert np.mean(recalls) >= 0.85
+
+
+def test_update_only_reindexes_changed_customers():
+    tm = segmented_matrix(300)
+    index = backend.build_similarity_index(tm)
+    before = {c: index['vectors'][c].copy() for c in tm.index}
+
+    grown = tm.copy()
+    grown.loc['c0', 'p1'] += 3
+    grown.loc['new'] = tm.loc['c1'].values
+    grown = grown.drop(index='c2')
+
+    assert backend.update_similarity_index(index, grown) == 2
+    assert 'c2' not in index['keys']
+    assert all(c != 'c2' for bucket in index['buckets'] for ids in bucket.values() for c in ids)
+    # untouched customers keep their vectors (transformers are frozen, not refitted)
+    assert all(np.array_equal(index['vectors'][c], before[c]) for c in tm.index[3:])
+    np.testing.assert_allclose(index['vectors']['new'], before['c1'])
+
+
+def test_candidate_cap_keeps_most_colliding_customers():
+    tm = segmented_matrix(2000)
+    index = backend.build_similarity_index(tm)
+
+    collisions = Counter()
+    for t, key in enumerate(index['keys']['c0']):
+        collisions.update(index['buckets'][t][int(key)])
+    collisions.pop('c0')
+    cutoff = sorted(collisions.values(), reverse=True)[49]
+
+    found = backend.query_similar_customers(index, 'c0', top_n=50, max_candidates=50)
+    assert found
+    assert all(collisions[c] >= cutoff for c, _ in found)
+
+
+def test_recommend_uses_index_built_at_load_time(client, auth):
+    with backend.app.app_context():
+        for t in range(60):
+            for product_id in ((1, 2) if t % 2 else (3, 4)):
+                backend.db.session.add(backend.Transaction(
+                    user_id=1 + t % 6, product_id=product_id, quantity=1, amount=1.0, transaction_id=f't{t}'
+                ))
+        backend.db.session.commit()
+
+    client.post('/api/load-transactions', json={}, headers=auth)
+    body = client.post('/api/recommend', json={'cart': [], 'user_id': '2'}, headers=auth).get_json()
+    assert set(body['by_neighbours'][:2]) == {'1', '2'}
+
+    # a CSV upload drops the index; recommend must not rebuild it inline
+    csv = 'Customer,Product\nc1,A\nc2,A\nc2,B\n'
+    client.post('/api/upload-data', data={'file': (io.BytesIO(csv.encode()), 'data.csv')}, headers=auth)
+    body = client.post('/api/recommend', json={'cart': [], 'user_id': 'c1'}, headers=auth).get_json()
+    assert body['by_neighbours'] == []
+    assert backend.transaction_matrix_store == {} and backend.similarity_index_store == {}
+
+
+def test_refresh_swaps_in_a_new_index_without_mutating_the_old_one():
+    tm = segmented_matrix(300)
+    backend.similarity_index_store['u'] = old = backend.build_similarity_index(tm)
+    old_keys = dict(old['keys'])
+    old_buckets = [{key: set(ids) for key, ids in table.items()} for table in old['buckets']]
+
+    changed = tm.drop(index='c2')
+    changed.loc['c0', 'p1'] += 3
+    try:
+        new = backend.refresh_similarity_index('u', changed)
+        assert backend.similarity_index_store['u'] is new and new is not old
+        assert 'c2' not in new['keys']
+        # a reader still holding the old index sees it exactly as before
+        assert old['keys'].keys() == old_keys.keys()
+        assert all(old['keys'][c] is keys for c, keys in old_keys.items())
+        assert [dict(table) for table in old['buckets']] == old_buckets
+        assert all(c in old['vectors'] for table in old['buckets'] for ids in table.values() for c in ids)
+    finally:
+        backend.similarity_index_store.pop('u', None)
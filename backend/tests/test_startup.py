@@ -0,0 +1,31 @@
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('pandas', 'numpy', 'sklearn', 'mlxtend')
+
+
+def loaded_after_import(warm_up=False):
+    """Import app in a fresh interpreter and return which heavy modules ended up loaded."""
+    code = (
+        "import json, sys\n"
+        "import app\n"
+        f"print(json.dumps(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))\n"
+    )
+    env = dict(os.environ, DATABASE_URL='sqlite://', MBA_WARM_UP_ANALYSIS='1' if warm_up else '')
+    out = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_import_app_does_not_load_ml_stack():
+    assert loaded_after_import() == []
+
+
+def test_warm_up_loads_ml_stack():
+    assert {'pandas', 'numpy', 'sklearn'} <= set(loaded_after_import(warm_up=True))